@@ -1,22 +1,190 @@
-import io
+import os
 import re
+import sys
 import json
+import asyncio
+import functools
+from pathlib import Path
 from google.cloud import vision_v1
+from google.cloud.vision_v1.services.image_annotator.transports import ImageAnnotatorGrpcAsyncIOTransport
 from google.oauth2 import service_account
 
+try:
+    import ahocorasick  # pyahocorasick, optional
+except ImportError:
+    ahocorasick = None
+
+try:
+    import re2  # google-re2, optional: linear-time matching
+except ImportError:
+    re2 = None
+
+# Every character stdlib re's \s matches in str patterns (all of str.isspace).
+# RE2's \s only covers ASCII [\t\n\f\r ], so it gets this set spelled out.
+_UNICODE_SPACES = "\t\n\x0b\x0c\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
+
+def _compile_linear(pattern, case_sensitive=False):
+    """Compile a pattern (case-insensitive by default) with RE2 if available, else with re."""
+    if re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = case_sensitive
+        # Widen \s (bare or in a "[:\s]" class) to match what re would
+        pattern = pattern.replace(r"[:\s]", f"[:{_UNICODE_SPACES}]").replace(r"\s", f"[{_UNICODE_SPACES}]")
+        return re2.compile(pattern, options)
+    return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+# Precompiled patterns (compiled once at import instead of on every call)
+# OCR unit quirks, fixed in a single pass
+_UNIT_REPLACEMENTS = {
+    "m9": "mg",    # Fix 'm9' -> 'mg'
+    "9": "g",      # Fix '9' -> 'g'
+    "ozz": "oz",   # Fix 'ozz' -> 'oz'
+    "cal": "Cal",  # Standardize 'cal' to 'Cal'
+}
+
+_UNITS_RE = re.compile(r'\b(\d+)\s*(m9|9|ozz|cal)\b', re.IGNORECASE)
+
+# Captures never start or end with whitespace, so matches need no strip().
+# The lazy capture can scan far on long OCR text, so prefer RE2 here.
+_SERVING_PATTERNS = tuple(_compile_linear(pattern) for pattern in [
+    r"Serving\s+Size[:\s]*([^.]*?)\s*(?:Serving|Amount|Calories|Per)",
+    r"Serving\s+Size[:\s]*([0-9]+(?:\s*[a-zA-Z]+)?)",
+    r"Serving[:\s]*([0-9]+(?:\s*[a-zA-Z]+)?)",
+])
+
+_CALORIES_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in [
+    r"Calories\s+(\d+)",
+    r"Energy\s+(\d+)\s*kcal",
+    r"Cal[:\s]*(\d+)",
+])
+
+def _possessive(pattern):
+    """Possessive quantifiers need Python 3.11+; drop them on older versions."""
+    if sys.version_info >= (3, 11):
+        return pattern
+    return pattern.replace("*+", "*").replace("++", "+")
+
+# All nutrient fields in one alternation; the named group that matched
+# (m.lastgroup) tells us which field was found. Possessive quantifiers keep
+# the engine from backtracking into whitespace/digit runs on a mismatch.
+_NUTRIENTS_RE = re.compile(_possessive("|".join([
+    r"(?:Total\s++Fat[:\s]*+(?P<total_fat>\d++\.?\d*+\s*+[g%]))",
+    r"(?:Saturated\s++Fat[:\s]*+(?P<saturated_fat>\d++\.?\d*+\s*+[g%]))",
+    r"(?:Cholesterol[:\s]*+(?P<cholesterol>\d++\s*+mg))",
+    r"(?:Sodium[:\s]*+(?P<sodium>\d++\s*+mg))",
+    r"(?:(?:Total\s++)?Carbohydrate[:\s]*+(?P<total_carbohydrate>\d++\.?\d*+\s*+[g%]))",
+    r"(?:(?:Dietary\s++)?Fiber[:\s]*+(?P<dietary_fiber>\d++\.?\d*+\s*+[g%]))",
+    r"(?:Sugars[:\s]*+(?P<sugars>\d++\.?\d*+\s*+[g%]))",
+    r"(?:Protein[:\s]*+(?P<protein>\d++\.?\d*+\s*+[g%]))",
+])), re.IGNORECASE)
+
+_INGREDIENTS_START_RE = re.compile(r'ingredients?[:\s]', re.IGNORECASE)
+
+# Markers that end the ingredients section. They match case-sensitively, as
+# the original split() did: "contains 2% or less of" inside the list and an
+# uppercase "CONTAINS: MILK" allergen statement must stay in the ingredients.
+_END_MARKERS = [
+    "\n\n", "Nutrition Facts", "Nutritional", "Allergen", "Contains",
+    "Storage", "Best before", "Dist.", "KEEP REFRIGERATED", "how2recycle.info",
+    "PLASTIC", "BOTTLE", "CA CRV", "CTRV", "HI 5¢", "ME 5¢", "% Daily Value",
+    "Serving size", "Amount per serving", "Calories", "Total Fat", "Cholesterol"
+]
+
+# RE2 finds all markers in one linear pass. Without it, a str.find per
+# marker is far faster than a stdlib re alternation.
+_END_MARKERS_RE = _compile_linear("(?:" + "|".join(re.escape(marker) for marker in _END_MARKERS) + ")", case_sensitive=True) if re2 is not None else None
+
+_ALLERGEN_GROUPS = {
+    "milk": ["milk", "dairy", "lactose", "whey", "casein"],
+    "eggs": ["egg", "eggs"],
+    "peanuts": ["peanut", "peanuts"],
+    "tree nuts": ["tree nut", "tree nuts", "almond", "almonds", "walnut", "walnuts",
+                  "cashew", "cashews", "pistachio", "pistachios",
+                  "hazelnut", "hazelnuts", "pecan", "pecans"],
+    "soy": ["soy", "soya", "tofu", "edamame"],
+    "wheat/gluten": ["wheat", "gluten", "barley", "rye", "spelt", "triticale"],
+    "fish": ["fish"],
+    "shellfish": ["shellfish", "crustacean", "crustaceans", "shrimp", "crab", "lobster"],
+    "sulfites": ["sulfite", "sulfites"],
+    "sesame": ["sesame"],
+    "mustard": ["mustard"]
+}
+
+# Reverse lookup from each allergen name to its group
+_ALLERGEN_TO_GROUP = {
+    allergen: group for group, items in _ALLERGEN_GROUPS.items() for allergen in items
+}
+
+# Longest names first so e.g. "tree nuts" wins over "tree nut"
+_ALLERGENS_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(allergen) for allergen in sorted(_ALLERGEN_TO_GROUP, key=len, reverse=True)) + r')\b'
+)
+
+def _build_allergen_automaton():
+    """Build an Aho-Corasick automaton mapping each allergen to its group."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for allergen, group in _ALLERGEN_TO_GROUP.items():
+        automaton.add_word(allergen, (group, allergen))
+    automaton.make_automaton()
+    return automaton
+
+_ALLERGEN_AUTOMATON = _build_allergen_automaton()
+
+# A literal from each pattern in parse_nutrition_info ("cal" also covers
+# "Calories" and "kcal")
+_ANCHOR_KEYWORDS = (
+    "serving", "cal", "fat", "cholesterol", "sodium", "carbohydrate",
+    "fiber", "sugars", "protein", "ingredient",
+)
+
+_NUMERIC_RE = re.compile(r'(\d+\.?\d*)')
+
+# The Vision API accepts at most 16 images per batch request
+_MAX_BATCH_SIZE = 16
+
+# Batch requests in flight at once. Each one holds up to 16 images in memory
+# and counts against the API quota, so large runs are sent in a bounded stream
+_MAX_CONCURRENT_BATCHES = 4
+
+# gRPC channel options: keep the connection alive between images and lift
+# the message size caps (the library's own transport sets the same -1 limits)
+_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.max_send_message_length", -1),
+    ("grpc.max_receive_message_length", -1),
+]
+
+# Service account key file, used unless GOOGLE_APPLICATION_CREDENTIALS is set
+_DEFAULT_CREDENTIALS_PATH = r"C:\Users\ajani\OneDrive\Desktop\nutritionlabelocr-df0a14d24981.json"
+
+@functools.lru_cache(maxsize=1)
+def _load_credentials():
+    """Parse the service account key file once per process"""
+    credentials_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS", _DEFAULT_CREDENTIALS_PATH)
+    return service_account.Credentials.from_service_account_file(credentials_path)
+
 # Credential setup (place this near the top of your script)
 def get_vision_client():
     """
-    Create and return a Google Cloud Vision client with credentials.
+    Create and return a Google Cloud Vision async client with credentials.
+    
+    Must be called from a coroutine, since the async gRPC channel is bound to
+    the running event loop. The caller owns the client: reuse it for every
+    request in the run and close it with `await client.transport.close()`.
     
-    IMPORTANT: Replace '/path/to/your/downloaded/keyfile.json' 
-    with the actual path to your Google Cloud service account JSON key file.
+    IMPORTANT: Set GOOGLE_APPLICATION_CREDENTIALS (or edit
+    _DEFAULT_CREDENTIALS_PATH) to the path of your Google Cloud service
+    account JSON key file.
     """
-    credentials_path = r"C:\Users\ajani\OneDrive\Desktop\nutritionlabelocr-df0a14d24981.json"
     try:
-        credentials = service_account.Credentials.from_service_account_file(credentials_path)
-        client = vision_v1.ImageAnnotatorClient(credentials=credentials)
-        return client
+        credentials = _load_credentials()
+        channel = ImageAnnotatorGrpcAsyncIOTransport.create_channel(credentials=credentials, options=_CHANNEL_OPTIONS)
+        # Start connecting now so the TLS/HTTP2 handshake overlaps reading the images
+        channel.get_state(try_to_connect=True)
+        return vision_v1.ImageAnnotatorAsyncClient(transport=ImageAnnotatorGrpcAsyncIOTransport(channel=channel))
     except Exception as e:
         print(f"Error setting up Vision client: {e}")
         print("Ensure:")
@@ -25,44 +193,92 @@ def get_vision_client():
         print("3. You have enabled the Vision API")
         return None
 
-def detect_text(image_path):
+async def detect_text(image_path, client=None):
     """Detects text in an image using Google Cloud Vision API"""
+    # The async client has no single-feature helpers, so send a one-image batch
+    detected_texts = await detect_text_batch([image_path], client)
+    return detected_texts[0]
+
+async def _read_image(image_path):
+    """Read an image file in a worker thread; returns None if it can't be read"""
+    # A single read_bytes call: the Image proto only accepts bytes, so an
+    # mmap/memoryview would be copied (or rejected) anyway
+    try:
+        return await asyncio.to_thread(Path(image_path).read_bytes)
+    except OSError as e:
+        print(f"Error reading image {image_path}: {e}")
+        return None
+
+async def _detect_text_chunk(client, image_paths):
+    """Detects text in up to 16 images with a single batch request"""
+    detected_texts = [""] * len(image_paths)
+    
+    # Unreadable files are reported and left out of the request
+    contents = await asyncio.gather(*(_read_image(image_path) for image_path in image_paths))
+    indices = [index for index, content in enumerate(contents) if content is not None]
+    if not indices:
+        return detected_texts
+    
+    # TEXT_DETECTION responses carry full_text_annotation too; reading its
+    # text skips walking the per-word text_annotations list
+    feature = vision_v1.Feature(type_=vision_v1.Feature.Type.TEXT_DETECTION)
+    batch = [
+        vision_v1.AnnotateImageRequest(image=vision_v1.Image(content=contents[index]), features=[feature])
+        for index in indices
+    ]
     try:
-        # Use the function to get the client
+        response = await client.batch_annotate_images(requests=batch)
+    except Exception as e:
+        print(f"Error in batch text detection: {e}")
+        return detected_texts
+    
+    for index, image_response in zip(indices, response.responses):
+        if image_response.error.message:
+            print(f"Error in text detection for {image_paths[index]}: {image_response.error.message}")
+        elif not image_response.full_text_annotation.text:
+            print(f"No text detected in {image_paths[index]}.")
+        else:
+            detected_texts[index] = image_response.full_text_annotation.text
+    
+    return detected_texts
+
+async def detect_text_batch(image_paths, client=None):
+    """Detects text in several images, sending up to 4 batches of 16 images at a time"""
+    # Without a client from the caller, open one just for this call
+    if client is None:
         client = get_vision_client()
-        
         if not client:
             print("Failed to create Vision client.")
-            return ""
-
-        with io.open(image_path, 'rb') as image_file:
-            content = image_file.read()
-
-        image = vision_v1.types.Image(content=content)
-        response = client.text_detection(image=image)
-        texts = response.text_annotations
-
-        if not texts:
-            print("No text detected.")
-            return ""
-
-        detected_text = texts[0].description  # First result is the full extracted text
-        return detected_text
-    except Exception as e:
-        print(f"Error in text detection: {e}")
-        return ""
+            return [""] * len(image_paths)
+        try:
+            return await detect_text_batch(image_paths, client)
+        finally:
+            await client.transport.close()
+    
+    # The semaphore covers the file reads as well as the request, so only the
+    # images of the batches in flight are held in memory
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_BATCHES)
+    
+    async def detect_chunk(chunk):
+        async with semaphore:
+            return await _detect_text_chunk(client, chunk)
+    
+    chunks = [image_paths[start:start + _MAX_BATCH_SIZE] for start in range(0, len(image_paths), _MAX_BATCH_SIZE)]
+    chunk_texts = await asyncio.gather(*(detect_chunk(chunk) for chunk in chunks))
+    return [text for texts in chunk_texts for text in texts]
 
 def normalize_units(text):
     """Normalize units in the OCR text."""
-    replacements = {
-        r'\b(\d+)\s*m9\b': r'\1 mg',    # Fix 'm9' -> 'mg'
-        r'\b(\d+)\s*9\b': r'\1 g',      # Fix '9' -> 'g'
-        r'\b(\d+)\s*ozz\b': r'\1 oz',   # Fix 'ozz' -> 'oz'
-        r'\b(\d+)\s*cal\b': r'\1 Cal'   # Standardize 'cal' to 'Cal'
-    }
-    for pattern, replacement in replacements.items():
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-    return text
+    return _UNITS_RE.sub(lambda m: f"{m.group(1)} {_UNIT_REPLACEMENTS[m.group(2).lower()]}", text)
+
+def _find_end_marker(text):
+    """Return the index of the earliest ingredients end marker in text, or -1."""
+    if _END_MARKERS_RE is not None:
+        end_match = _END_MARKERS_RE.search(text)
+        return end_match.start() if end_match else -1
+    
+    positions = [text.find(marker) for marker in _END_MARKERS]
+    return min((position for position in positions if position != -1), default=-1)
 
 def parse_nutrition_info(text):
     """Parse nutrition information from extracted text."""
@@ -80,66 +296,49 @@ def parse_nutrition_info(text):
         "ingredients": None,
     }
     
-    # Serving size patterns
-    serving_patterns = [
-        r"Serving\s+Size[:\s]*([^\.]*?)(Serving|Amount|Calories|Per)",
-        r"Serving\s+Size[:\s]*([0-9]+\s*[a-zA-Z]*)",
-        r"Serving[:\s]*([0-9]+\s*[a-zA-Z]*)",
-    ]
+    # Every pattern below needs one of these words, so skip them all if none
+    # appear (e.g. blurry or partial OCR output)
+    text_lower = text.lower()
+    if not any(keyword in text_lower for keyword in _ANCHOR_KEYWORDS):
+        return nutrition_data
     
-    for pattern in serving_patterns:
-        serving_match = re.search(pattern, text, re.IGNORECASE)
+    # Serving size patterns
+    for pattern in _SERVING_PATTERNS:
+        serving_match = pattern.search(text)
         if serving_match:
-            serving_size = serving_match.group(1).strip()
+            serving_size = serving_match.group(1)
             if serving_size:
                 nutrition_data["serving_size"] = serving_size
                 break
     
     # Calories patterns
-    calories_patterns = [
-        r"Calories\s+(\d+)",
-        r"Energy\s+(\d+)\s*kcal",
-        r"Cal[:\s]*(\d+)",
-    ]
-    
-    for pattern in calories_patterns:
-        calories_match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _CALORIES_PATTERNS:
+        calories_match = pattern.search(text)
         if calories_match:
-            nutrition_data["calories"] = calories_match.group(1).strip()
+            nutrition_data["calories"] = calories_match.group(1)
             break
     
     # Nutrition fact patterns
-    nutrient_patterns = [
-        ("total_fat", r"Total\s+Fat\s*[:\s]*\s*(\d+\.?\d*\s*[g%])"),
-        ("saturated_fat", r"Saturated\s+Fat\s*[:\s]*\s*(\d+\.?\d*\s*[g%])"),
-        ("cholesterol", r"Cholesterol\s*[:\s]*\s*(\d+\s*mg)"),
-        ("sodium", r"Sodium\s*[:\s]*\s*(\d+\s*mg)"),
-        ("total_carbohydrate", r"(Total\s+)?Carbohydrate\s*[:\s]*\s*(\d+\.?\d*\s*[g%])"),
-        ("dietary_fiber", r"(Dietary\s+)?Fiber\s*[:\s]*\s*(\d+\.?\d*\s*[g%])"),
-        ("sugars", r"Sugars\s*[:\s]*\s*(\d+\.?\d*\s*[g%])"),
-        ("protein", r"Protein\s*[:\s]*\s*(\d+\.?\d*\s*[g%])")
-    ]
-    
-    for key, pattern in nutrient_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            # Handle patterns with capture groups
-            nutrition_data[key] = match.group(1).strip() if len(match.groups()) == 1 else match.group(2).strip()
+    for match in _NUTRIENTS_RE.finditer(text):
+        key = match.lastgroup
+        # Keep the first occurrence of each field
+        if nutrition_data[key] is None:
+            # Store as (value, unit) so later checks are plain arithmetic
+            amount = match.group(key)
+            number = _NUMERIC_RE.match(amount)
+            nutrition_data[key] = (float(number.group(1)), amount[number.end():].lstrip())
     
     # Ingredients extraction
-    ingredients_section = re.split(r'(?:Ingredients|INGREDIENTS|INGREDIENT|ingredient)[:\s]', text, flags=re.IGNORECASE)
-    if len(ingredients_section) > 1:
-        potential_ingredients = ingredients_section[1].strip()
-        # Refine end markers to exclude unrelated text
-        end_markers = [
-            "\n\n", "Nutrition Facts", "Nutritional", "Allergen", "Contains", 
-            "Storage", "Best before", "Dist.", "KEEP REFRIGERATED", "how2recycle.info", 
-            "PLASTIC", "BOTTLE", "CA CRV", "CTRV", "HI 5¢", "ME 5¢", "% Daily Value", 
-            "Serving size", "Amount per serving", "Calories", "Total Fat", "Cholesterol"
-        ]
-        for marker in end_markers:
-            if marker.lower() in potential_ingredients.lower():
-                potential_ingredients = potential_ingredients.split(marker, 1)[0].strip()
+    ingredients_start = _INGREDIENTS_START_RE.search(text)
+    if ingredients_start:
+        # The section runs up to the next "Ingredients" heading, if any
+        ingredients_end = _INGREDIENTS_START_RE.search(text, ingredients_start.end())
+        end = ingredients_end.start() if ingredients_end else len(text)
+        potential_ingredients = text[ingredients_start.end():end].strip()
+        # Cut at the earliest end marker to exclude unrelated text
+        end_index = _find_end_marker(potential_ingredients)
+        if end_index != -1:
+            potential_ingredients = potential_ingredients[:end_index].strip()
         
         # Ensure the extracted ingredients are meaningful
         if len(potential_ingredients) > 10:
@@ -147,79 +346,41 @@ def parse_nutrition_info(text):
     
     return nutrition_data
 
+def _is_word_char(char):
+    """Return True if char counts as a word character for regex \\b."""
+    return char.isalnum() or char == "_"
+
 def check_for_allergens(ingredients_text):
     """Check for common allergens in ingredients."""
     if not ingredients_text:
         return []
     
-    common_allergens = [
-        "milk", "dairy", "lactose", "whey", "casein",
-        "egg", "eggs",
-        "peanut", "peanuts",
-        "tree nut", "tree nuts", "almond", "almonds", "walnut", "walnuts", 
-        "cashew", "cashews", "pistachio", "pistachios", 
-        "hazelnut", "hazelnuts", "pecan", "pecans",
-        "soy", "soya", "tofu", "edamame",
-        "wheat", "gluten", "barley", "rye", "spelt", "triticale",
-        "fish", "shellfish", "crustacean", "crustaceans", 
-        "shrimp", "crab", "lobster",
-        "sulfite", "sulfites",
-        "sesame", "mustard"
-    ]
-    
-    found_allergens = []
     ingredients_lower = ingredients_text.lower()
     
-    for allergen in common_allergens:
-        if re.search(r'\b' + re.escape(allergen) + r'\b', ingredients_lower):
-            found_allergens.append(allergen)
-    
-    # Special case for "may contain" statements
-    may_contain_match = re.search(r"may\s+contain\s+([^\.]*)", ingredients_lower)
-    if may_contain_match:
-        may_contain_text = may_contain_match.group(1)
-        for allergen in common_allergens:
-            if re.search(r'\b' + re.escape(allergen) + r'\b', may_contain_text):
-                found_allergens.append(allergen)
+    # Single linear scan when pyahocorasick is available
+    if _ALLERGEN_AUTOMATON is not None:
+        found_groups = set()
+        for end, (group, allergen) in _ALLERGEN_AUTOMATON.iter(ingredients_lower):
+            start = end - len(allergen) + 1
+            # Enforce the same word boundaries as the r'\b...\b' patterns
+            if start > 0 and _is_word_char(ingredients_lower[start - 1]):
+                continue
+            if end + 1 < len(ingredients_lower) and _is_word_char(ingredients_lower[end + 1]):
+                continue
+            found_groups.add(group)
+        return list(found_groups)
+    
+    # One scan over the whole text. "May contain" statements are part of it,
+    # so they need no separate pass.
+    found_allergens = [match.group(1) for match in _ALLERGENS_RE.finditer(ingredients_lower)]
     
     # Deduplicate related allergens
-    allergen_groups = {
-        "milk": ["milk", "dairy", "lactose", "whey", "casein"],
-        "eggs": ["egg", "eggs"],
-        "peanuts": ["peanut", "peanuts"],
-        "tree nuts": ["tree nut", "tree nuts", "almond", "almonds", "walnut", "walnuts", 
-                     "cashew", "cashews", "pistachio", "pistachios", 
-                     "hazelnut", "hazelnuts", "pecan", "pecans"],
-        "soy": ["soy", "soya", "tofu", "edamame"],
-        "wheat/gluten": ["wheat", "gluten", "barley", "rye", "spelt", "triticale"],
-        "fish": ["fish"],
-        "shellfish": ["shellfish", "crustacean", "crustaceans", "shrimp", "crab", "lobster"],
-        "sulfites": ["sulfite", "sulfites"],
-        "sesame": ["sesame"],
-        "mustard": ["mustard"]
-    }
-    
-    deduplicated_allergens = set()
-    for found in found_allergens:
-        for group, items in allergen_groups.items():
-            if found in items:
-                deduplicated_allergens.add(group)
-                break
-    
-    return list(deduplicated_allergens)
+    return list({_ALLERGEN_TO_GROUP[found] for found in found_allergens})
 
 def check_nutritional_concerns(nutrition_data):
-    """Check for nutritional concerns based on the nutrition data."""
+    """Check for nutritional concerns based on the (value, unit) nutrient amounts."""
     concerns = []
     
-    def extract_numeric(value_str):
-        if not value_str:
-            return None
-        match = re.search(r'(\d+\.?\d*)', value_str)
-        if match:
-            return float(match.group(1))
-        return None
-    
     # Nutritional thresholds
     thresholds = {
         "sodium": 500,   # mg
@@ -228,8 +389,8 @@ def check_nutritional_concerns(nutrition_data):
     }
     
     for nutrient, threshold in thresholds.items():
-        value = extract_numeric(nutrition_data.get(nutrient))
-        if value is not None and value > threshold:
+        amount = nutrition_data.get(nutrient)
+        if amount is not None and amount[0] > threshold:
             concerns.append(f"high {nutrient}")
     
     return concerns
@@ -276,14 +437,8 @@ def generate_response(nutrition_data, extracted_text):
     
     return response
 
-def main(image_path):
-    """Main function to process nutrition label image"""
-    # Detect text
-    extracted_text = detect_text(image_path)
-    if not extracted_text:
-        print("Failed to extract text from image.")
-        return None
-    
+def analyze_text(extracted_text):
+    """Normalize, parse and summarize the text extracted from one label"""
     # Normalize units
     extracted_text = normalize_units(extracted_text)
     
@@ -309,6 +464,40 @@ def main(image_path):
         "response": response
     }
 
+async def main_many(image_paths):
+    """Process several nutrition label images, overlapping file reads and requests"""
+    # One client (one channel and TLS handshake) for the whole run, closed at the end
+    client = get_vision_client()
+    if client:
+        try:
+            extracted_texts = await detect_text_batch(image_paths, client)
+        finally:
+            await client.transport.close()
+    else:
+        print("Failed to create Vision client.")
+        extracted_texts = [""] * len(image_paths)
+    
+    results = []
+    for image_path, extracted_text in zip(image_paths, extracted_texts):
+        if not extracted_text:
+            print(f"Failed to extract text from image: {image_path}")
+            results.append(None)
+            continue
+        results.append(analyze_text(extracted_text))
+    
+    return results
+
+def main(image_paths):
+    """Main function to process one or more nutrition label images"""
+    # Accept a single path as well as a list of paths
+    single_image = isinstance(image_paths, str)
+    if single_image:
+        image_paths = [image_paths]
+    
+    results = asyncio.run(main_many(image_paths))
+    
+    return results[0] if single_image else results
+
 if __name__ == "__main__":
     # Example usage
     image_path = "C:\\Users\\ajani\\Downloads\\sorted_data\\test_lable1.jpg"
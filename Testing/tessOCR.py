@@ -1,30 +1,164 @@
-import pytesseract
+from tesserocr import PyTessBaseAPI, PSM, OEM
 from PIL import Image, ImageEnhance, ImageFilter
+import os
 import re
 import sys
+import threading
 import json
 import cv2
 import numpy as np
-import os
 
-# Load SSD model for text detection
+try:
+    import ahocorasick  # pyahocorasick, optional
+except ImportError:
+    ahocorasick = None
+
+# Load SSD model for text detection. The net is shared by every caller, and
+# setInput/forward on it are not thread-safe, so all use goes through _NET_LOCK
 net = cv2.dnn.readNet("C:\\xampp\\htdocs\\Website\\frozen_east_text_detection.pb")
 
+_EAST_OUTPUT_LAYERS = ["feature_fusion/Conv_7/Sigmoid", "feature_fusion/concat_3"]
+_EAST_MEAN = (123.68, 116.78, 103.94)
+_NET_LOCK = threading.Lock()
+
+def _configure_backend(net):
+    """Run the EAST net on CUDA in FP16 when available, otherwise on the CPU."""
+    try:
+        if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+            return
+    except (AttributeError, cv2.error):
+        pass
+    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+    # FP16 on the CPU needs OpenCV 4.8+, use plain FP32 otherwise
+    net.setPreferableTarget(getattr(cv2.dnn, "DNN_TARGET_CPU_FP16", cv2.dnn.DNN_TARGET_CPU))
+
+# A few threads per forward pass; more only oversubscribe the CPU when
+# several requests or worker processes run at once
+cv2.setNumThreads(min(4, os.cpu_count() or 1))
+_configure_backend(net)
+
+# Precompiled patterns (compiled once at import instead of on every call)
+_UNIT_REPLACEMENTS = [
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in [
+        (r'\b(\d+)\s*m9\b', r'\1 mg'),  # Fix 'm9' -> 'mg'
+        (r'\b(\d+)\s*9\b', r'\1 g'),    # Fix '9' -> 'g'
+        (r'\b(\d+)\s*ozz\b', r'\1 oz'), # Fix 'ozz' -> 'oz'
+    ]
+]
+
+# Everything below is matched against lowercased text (see _lower_aligned),
+# which is cheaper than matching the original with re.IGNORECASE
+_KEYWORDS_RE = re.compile(
+    r'\b(?:nutrition|serving|calories|fat|protein|carbohydrate|sodium|sugar|vitamin|mineral)\b'
+)
+
+_SERVING_PATTERNS = tuple(re.compile(pattern) for pattern in [
+    r"serving\s+size[:\s]*([^\.]*?)(serving|amount|calories|per)",
+    r"serving\s+size[:\s]*([0-9]+\s*[a-z]*)",
+    r"serving[:\s]*([0-9]+\s*[a-z]*)",
+])
+
+_CALORIES_PATTERNS = tuple(re.compile(pattern) for pattern in [
+    r"calories\s+(\d+)",
+    r"energy\s+(\d+)\s*kcal",
+    r"cal[:\s]*(\d+)",
+])
+
+# All nutrient fields in one alternation; the named group that matched
+# (m.lastgroup) tells us which field was found
+_NUTRIENTS_RE = re.compile("|".join([
+    r"(?:total\s+fat[:\s]*(?P<total_fat>\d+\.?\d*\s*[g%]))",
+    r"(?:saturated\s+fat[:\s]*(?P<saturated_fat>\d+\.?\d*\s*[g%]))",
+    r"(?:cholesterol[:\s]*(?P<cholesterol>\d+\s*mg))",
+    r"(?:sodium[:\s]*(?P<sodium>\d+\s*mg))",
+    r"(?:(?:total\s+)?carbohydrate[:\s]*(?P<total_carbohydrate>\d+\.?\d*\s*[g%]))",
+    r"(?:(?:dietary\s+)?fiber[:\s]*(?P<dietary_fiber>\d+\.?\d*\s*[g%]))",
+    r"(?:sugars[:\s]*(?P<sugars>\d+\.?\d*\s*[g%]))",
+    r"(?:protein[:\s]*(?P<protein>\d+\.?\d*\s*[g%]))",
+]))
+
+_INGREDIENTS_SPLIT_RE = re.compile(r'ingredients[:\s]')
+_CONTAINS_RE = re.compile(r"contains[:\s]\s*([^\.]*)")
+
+# Markers that end the ingredients section, found in a single pass. Unlike
+# the patterns above, this one runs on the original text and is
+# case-sensitive, as the original split() was: "contains 2% or less of"
+# inside the list and an uppercase "CONTAINS: MILK" statement must stay in
+# the ingredients.
+_END_MARKERS_RE = re.compile(
+    r'\n\n|Nutrition Facts|Distributed by|Keep Refrigerated|Allergen|Contains|Storage|Best before|how2recycle|PLASTIC'
+)
+
+# Common ingredient words that mark a comma-separated line as ingredients
+_INGREDIENT_INDICATORS_RE = re.compile(
+    r'water|sugar|salt|oil|extract|acid|flour|starch|natural|artificial'
+)
+
+_ALLERGEN_GROUPS = {
+    "milk": ["milk", "dairy", "lactose", "whey", "casein"],
+    "eggs": ["egg", "eggs"],
+    "peanuts": ["peanut", "peanuts"],
+    "tree nuts": ["tree nut", "tree nuts", "almond", "almonds", "walnut", "walnuts", "cashew", "cashews", "pistachio", "pistachios", "hazelnut", "hazelnuts", "pecan", "pecans"],
+    "soy": ["soy", "soya", "tofu", "edamame"],
+    "wheat/gluten": ["wheat", "gluten", "barley", "rye", "spelt", "triticale"],
+    "fish": ["fish"],
+    "shellfish": ["shellfish", "crustacean", "crustaceans", "shrimp", "crab", "lobster"],
+    "sulfites": ["sulfite", "sulfites"],
+    "sesame": ["sesame"],
+    "mustard": ["mustard"]
+}
+
+# Reverse lookup from each allergen name to its group
+_ALLERGEN_TO_GROUP = {
+    allergen: group for group, items in _ALLERGEN_GROUPS.items() for allergen in items
+}
+
+# Longest names first so e.g. "tree nuts" wins over "tree nut"
+_ALLERGENS_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(allergen) for allergen in sorted(_ALLERGEN_TO_GROUP, key=len, reverse=True)) + r')\b'
+)
+
+def _build_allergen_automaton():
+    """Build an Aho-Corasick automaton mapping each allergen to its group."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for allergen, group in _ALLERGEN_TO_GROUP.items():
+        automaton.add_word(allergen, (group, allergen))
+    automaton.make_automaton()
+    return automaton
+
+_ALLERGEN_AUTOMATON = _build_allergen_automaton()
+
+_NUMERIC_RE = re.compile(r'(\d+\.?\d*)')
+
+# Adaptive threshold neighbourhood (odd, in pixels) and the offset below the
+# local Gaussian-weighted mean a pixel must fall to count as ink
+_THRESHOLD_BLOCK_SIZE = 31
+_THRESHOLD_OFFSET = 10
+
+# One Tesseract handle for the whole process, so the LSTM model is loaded
+# once instead of by a new tesseract process on every call. Like the EAST
+# net it is not thread-safe, so each use holds _OCR_LOCK
+api = PyTessBaseAPI(psm=PSM.AUTO, oem=OEM.LSTM_ONLY)
+_OCR_LOCK = threading.Lock()
+
+# Words below this Tesseract confidence (0-100) are left out of the sparse
+# text layout
+_SPARSE_MIN_CONFIDENCE = 60
+
 def normalize_units(text):
     """Normalize units in the OCR text."""
-    replacements = {
-        r'\b(\d+)\s*m9\b': r'\1 mg',  # Fix 'm9' -> 'mg'
-        r'\b(\d+)\s*9\b': r'\1 g',    # Fix '9' -> 'g'
-        r'\b(\d+)\s*ozz\b': r'\1 oz'  # Fix 'ozz' -> 'oz'
-    }
-    
-    for pattern, replacement in replacements.items():
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    for pattern, replacement in _UNIT_REPLACEMENTS:
+        text = pattern.sub(replacement, text)
     
     return text
 
 def preprocess_image(image_path):
-    """Preprocess the image to improve OCR accuracy."""
+    """Preprocess the image to improve OCR accuracy; returns the binarized array."""
     try:
         # Read image
         img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)  # Convert to grayscale
@@ -32,17 +166,12 @@ def preprocess_image(image_path):
             print(f"Error: Unable to load image at {image_path}")
             return None
         
-        # Reduce noise
-        img = cv2.GaussianBlur(img, (5, 5), 0)
-        
-        # Apply thresholding
-        _, img = cv2.threshold(img, 150, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Save preprocessed image
-        temp_file = f"temp_preprocessed_{os.path.basename(image_path)}"
-        cv2.imwrite(temp_file, img)
+        # Apply thresholding against a Gaussian-weighted local mean, which
+        # smooths noise and copes with uneven lighting in a single pass
+        img = cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, _THRESHOLD_BLOCK_SIZE, _THRESHOLD_OFFSET)
         
-        return temp_file
+        # Hand the array straight to the OCR step instead of a temp file
+        return img
     except Exception as e:
         print(f"Error preprocessing image: {e}")
         return None
@@ -50,68 +179,55 @@ def preprocess_image(image_path):
 def decode_predictions(scores, geometry, score_thresh):
     """Decode the predictions of the EAST text detector."""
     (num_rows, num_cols) = scores.shape[2:4]
-    rectangles = []
-    confidences = []
-
-    for y in range(num_rows):
-        scores_data = scores[0, 0, y]
-        x_data0 = geometry[0, 0, y]
-        x_data1 = geometry[0, 1, y]
-        x_data2 = geometry[0, 2, y]
-        x_data3 = geometry[0, 3, y]
-        angles_data = geometry[0, 4, y]
-
-        for x in range(num_cols):
-            score = scores_data[x]
-            if score < score_thresh:
-                continue
 
-            offset_x = x * 4.0
-            offset_y = y * 4.0
+    # Work on whole score/geometry planes at once instead of per cell
+    scores_data = scores[0, 0]
+    x_data0, x_data1, x_data2, x_data3, angles_data = geometry[0, :5]
 
-            angle = angles_data[x]
-            cos = np.cos(angle)
-            sin = np.sin(angle)
+    # Each output cell maps to a 4x4 pixel block of the input
+    offset_y, offset_x = np.mgrid[0:num_rows, 0:num_cols] * 4.0
 
-            h = x_data0[x] + x_data2[x]
-            w = x_data1[x] + x_data3[x]
+    cos = np.cos(angles_data)
+    sin = np.sin(angles_data)
 
-            end_x = int(offset_x + (cos * x_data1[x]) + (sin * x_data2[x]))
-            end_y = int(offset_y - (sin * x_data1[x]) + (cos * x_data2[x]))
-            start_x = int(end_x - w)
-            start_y = int(end_y - h)
+    h = x_data0 + x_data2
+    w = x_data1 + x_data3
 
-            rectangles.append((start_x, start_y, end_x, end_y))
-            confidences.append(float(score))
+    end_x = (offset_x + (cos * x_data1) + (sin * x_data2)).astype(np.int32)
+    end_y = (offset_y - (sin * x_data1) + (cos * x_data2)).astype(np.int32)
+    start_x = (end_x - w).astype(np.int32)
+    start_y = (end_y - h).astype(np.int32)
 
-    return rectangles, confidences
+    mask = scores_data >= score_thresh
+    rectangles = np.stack([start_x[mask], start_y[mask], end_x[mask], end_y[mask]], axis=1).tolist()
+    confidences = scores_data[mask].astype(float).tolist()
 
-def detect_text(image_path):
-    """Detect text regions in an image using the EAST text detector."""
-    image = cv2.imread(image_path)
-    if image is None:
-        print(f"Error: Unable to load image at {image_path}")
-        return None
+    return rectangles, confidences
 
-    orig = image.copy()
+def _forward_east(blob):
+    """Run the EAST forward pass, dropping to plain CPU if the chosen backend fails."""
+    with _NET_LOCK:
+        net.setInput(blob)
+        try:
+            return net.forward(_EAST_OUTPUT_LAYERS)
+        except cv2.error as e:
+            print(f"EAST backend failed ({e}), retrying on CPU")
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            net.setInput(blob)
+            return net.forward(_EAST_OUTPUT_LAYERS)
+
+def _resize_for_east(image):
+    """Resize an image so both dimensions are multiples of 32."""
     (H, W) = image.shape[:2]
 
     # Ensure the image dimensions are multiples of 32
     newW = (W // 32) * 32
     newH = (H // 32) * 32
-    resized_image = cv2.resize(image, (newW, newH))
-
-    # Prepare the image for the EAST detector
-    blob = cv2.dnn.blobFromImage(resized_image, 1.0, (newW, newH), (123.68, 116.78, 103.94), swapRB=True, crop=False)
-    net.setInput(blob)
-
-    # Run the EAST detector to get the text regions
-    try:
-        scores, geometry = net.forward(["feature_fusion/Conv_7/Sigmoid", "feature_fusion/concat_3"])
-    except Exception as e:
-        print(f"Error during EAST model forward pass: {e}")
-        return None
+    return cv2.resize(image, (newW, newH))
 
+def _find_text_boxes(scores, geometry):
+    """Decode one image's EAST output and apply NMS, returning (rectangles, indices)."""
     # Validate the shape of scores and geometry
     if scores is None or geometry is None or len(scores.shape) != 4 or len(geometry.shape) != 4:
         print("Invalid output from EAST text detector.")
@@ -131,18 +247,188 @@ def detect_text(image_path):
         print("No text detected after NMS.")
         return None
 
-    # Draw the bounding boxes on the image
-    for i in indices:
-        (start_x, start_y, end_x, end_y) = rectangles[i[0]]
-        cv2.rectangle(image, (start_x, start_y), (end_x, end_y), (0, 255, 0), 2)
+    return rectangles, indices
+
+def _show_text_boxes(image, rectangles, indices):
+    """Draw the detected text boxes on the image and display it."""
+    # Pick the surviving boxes in one go (NMSBoxes returns flat or Nx1
+    # indices depending on the OpenCV version) and draw them in one call
+    boxes = np.asarray(rectangles, dtype=np.int32)[np.asarray(indices).flatten()]
+    corners = np.stack([boxes[:, [0, 1]], boxes[:, [2, 1]], boxes[:, [2, 3]], boxes[:, [0, 3]]], axis=1)
+    cv2.polylines(image, corners, True, (0, 255, 0), 2)
 
     # Show the image
     cv2.imshow("Text Detection", image)
     cv2.waitKey(0)
     cv2.destroyAllWindows()
 
+def _load_image(image_or_path):
+    """Return a BGR image, reading it from disk unless it is already an array."""
+    if isinstance(image_or_path, np.ndarray):
+        return image_or_path
+
+    image = cv2.imread(image_or_path)
+    if image is None:
+        print(f"Error: Unable to load image at {image_or_path}")
+    return image
+
+def detect_text(image_or_path, show=False):
+    """Detect text regions in an image (array or path) using the EAST text detector."""
+    image = _load_image(image_or_path)
+    if image is None:
+        return None
+
+    resized_image = _resize_for_east(image)
+    (newH, newW) = resized_image.shape[:2]
+
+    # Prepare the image for the EAST detector
+    blob = cv2.dnn.blobFromImage(resized_image, 1.0, (newW, newH), _EAST_MEAN, swapRB=True, crop=False)
+
+    # Run the EAST detector to get the text regions
+    try:
+        scores, geometry = _forward_east(blob)
+    except Exception as e:
+        print(f"Error during EAST model forward pass: {e}")
+        return None
+
+    boxes = _find_text_boxes(scores, geometry)
+    if boxes is None:
+        return None
+
+    # Drawing is only for the preview window, and would modify a caller's array
+    if show:
+        _show_text_boxes(image, *boxes)
+
     return "detected_text.png"
 
+def detect_text_batch(image_paths, show=False):
+    """Detect text regions in several images (arrays or paths) with a single EAST forward pass."""
+    results = [None] * len(image_paths)
+
+    images = []
+    resized_images = []
+    for index, image_or_path in enumerate(image_paths):
+        image = _load_image(image_or_path)
+        if image is None:
+            continue
+        images.append((index, image))
+        resized_images.append(_resize_for_east(image))
+
+    if not resized_images:
+        return results
+
+    # The batch needs one input size, so pad every image up to the largest
+    # one instead of rescaling it. Box coordinates then stay the same as in
+    # detect_text, and the padding colour is the mean so it blanks to zero.
+    maxH = max(resized.shape[0] for resized in resized_images)
+    maxW = max(resized.shape[1] for resized in resized_images)
+    pad_colour = _EAST_MEAN[::-1]  # BGR, before swapRB
+    padded_images = [
+        cv2.copyMakeBorder(resized, 0, maxH - resized.shape[0], 0, maxW - resized.shape[1], cv2.BORDER_CONSTANT, value=pad_colour)
+        for resized in resized_images
+    ]
+
+    blob = cv2.dnn.blobFromImages(padded_images, 1.0, (maxW, maxH), _EAST_MEAN, swapRB=True, crop=False)
+
+    try:
+        scores, geometry = _forward_east(blob)
+    except Exception as e:
+        print(f"Error during EAST model forward pass: {e}")
+        return results
+
+    # Each batch entry is decoded on its own slice of the output
+    for b, (index, image) in enumerate(images):
+        boxes = _find_text_boxes(scores[b:b + 1], geometry[b:b + 1])
+        if boxes is None:
+            continue
+        if show:
+            _show_text_boxes(image, *boxes)
+        results[index] = "detected_text.png"
+
+    return results
+
+def _parse_tsv_words(tsv):
+    """Parse Tesseract TSV output into (block, paragraph, line, left, width, conf, text) words."""
+    words = []
+    for row in tsv.splitlines():
+        # Columns: level, page, block, par, line, word, left, top, width,
+        # height, conf, text. Level 5 rows are single words.
+        fields = row.split('\t')
+        if len(fields) < 12 or fields[0] != '5':
+            continue
+        text = fields[11].strip()
+        if text:
+            words.append((int(fields[2]), int(fields[3]), int(fields[4]), int(fields[6]), int(fields[8]), float(fields[10]), text))
+    return words
+
+def _layout_texts(words):
+    """Rebuild the recognized words as line-order, single-column and sparse texts."""
+    # Group words into lines, keeping Tesseract's reading order
+    lines = {}
+    for block, par, line, left, width, conf, text in words:
+        lines.setdefault((block, par, line), []).append((left + width / 2, conf, text))
+    
+    line_order = []
+    block_lines = {}
+    block_centres = {}
+    sparse = []
+    previous_par = None
+    for (block, par, line), line_words in lines.items():
+        line_text = ' '.join(text for _, _, text in line_words)
+        
+        # Line order (like PSM 3): blank line between paragraphs
+        if previous_par is not None and (block, par) != previous_par:
+            line_order.append('')
+        line_order.append(line_text)
+        previous_par = (block, par)
+        
+        block_lines.setdefault(block, []).append(line_text)
+        block_centres.setdefault(block, []).extend(centre for centre, _, _ in line_words)
+        
+        # Sparse text (like PSM 11): only the confidently recognized words
+        confident = [text for _, conf, text in line_words if conf >= _SPARSE_MIN_CONFIDENCE]
+        if confident:
+            sparse.append(' '.join(confident))
+    
+    # Single column (like PSM 4): whole blocks read left to right by the
+    # horizontal centre of their words, without paragraph gaps
+    block_order = sorted(block_lines, key=lambda block: sum(block_centres[block]) / len(block_centres[block]))
+    single_column = [line_text for block in block_order for line_text in block_lines[block]]
+    
+    return ['\n'.join(line_order), '\n'.join(single_column), '\n'.join(sparse)]
+
+def _count_nutrition_fields(text):
+    """Count the distinct nutrition fields the parse patterns find in text."""
+    text_lower = _lower_aligned(text)
+    fields = {match.lastgroup for match in _NUTRIENTS_RE.finditer(text_lower)}
+    serving = any(pattern.search(text_lower) for pattern in _SERVING_PATTERNS)
+    calories = any(pattern.search(text_lower) for pattern in _CALORIES_PATTERNS)
+    return len(fields) + serving + calories
+
+def _ocr_image(image_path):
+    """Preprocess an image and OCR it, keeping the best layout's text."""
+    # Preprocess image first
+    preprocessed_image = preprocess_image(image_path)
+    if preprocessed_image is None:
+        print("Image preprocessing failed, trying original image")
+        image = Image.open(image_path)
+    else:
+        image = Image.fromarray(preprocessed_image)
+    
+    # Recognize the page once in automatic mode, then lay the words out the
+    # way the other page segmentation modes would, instead of running the
+    # LSTM again for each mode
+    with _OCR_LOCK:
+        api.SetImage(image)
+        tsv = api.GetTSVText(0)
+    texts = [normalize_units(text) for text in _layout_texts(_parse_tsv_words(tsv))]
+    
+    # All layouts hold the same words, so length alone always picks line
+    # order. Keep the one that yields the most nutrition fields instead (word
+    # order decides which labels and values end up next to each other), then
+    # the longest, then line order.
+    return max(texts, key=lambda text: (_count_nutrition_fields(text), len(text)))
+
 def extract_text_from_image(image_path):
     """Extract text from an image using multiple OCR configurations."""
     try:
@@ -151,63 +437,53 @@ def extract_text_from_image(image_path):
         if detected_text_image_path:
             image_path = detected_text_image_path
         
-        # Preprocess image first
-        preprocessed_image_path = preprocess_image(image_path)
-        if preprocessed_image_path is None:
-            print("Image preprocessing failed, trying original image")
-            preprocessed_image_path = image_path
-        
-        # Try multiple OCR configurations and combine results
-        image = Image.open(preprocessed_image_path)
-        
-        # Configuration 1: Standard
-        text1 = pytesseract.image_to_string(image)
-        
-        # Configuration 2: Page segmentation mode 4 (single column of text)
-        text2 = pytesseract.image_to_string(image, config='--psm 4')
-        
-        # Configuration 3: Page segmentation mode 6 (single uniform block of text)
-        text3 = pytesseract.image_to_string(image, config='--psm 6')
-        
-        # Configuration 4: Page segmentation mode 11 (sparse text - no specific formatting)
-        text4 = pytesseract.image_to_string(image, config='--psm 11')
-        
-        # Configuration 5: LSTM OCR Engine mode with line segmentation
-        text5 = pytesseract.image_to_string(image, config='--psm 3 --oem 1')
-        
-        # Combine texts (use the longest one as it probably has the most information)
-        texts = [text1, text2, text3, text4, text5]
-        best_text = max(texts, key=len)
-        
-        # Normalize units in the combined text
-        normalized_text = normalize_units(best_text)
-        
-        # Clean up temporary file
-        if preprocessed_image_path != image_path:
-            try:
-                os.remove(preprocessed_image_path)
-            except:
-                pass
-                
-        return normalized_text
+        return _ocr_image(image_path)
     except Exception as e:
         print(f"Error extracting text: {e}")
         return None
 
+def extract_text_from_images(image_paths):
+    """Extract text from several images, running text detection as one batch."""
+    try:
+        detected_paths = detect_text_batch(image_paths)
+    except Exception as e:
+        print(f"Error detecting text: {e}")
+        detected_paths = [None] * len(image_paths)
+    
+    texts = []
+    for image_path, detected_text_image_path in zip(image_paths, detected_paths):
+        try:
+            texts.append(_ocr_image(detected_text_image_path or image_path))
+        except Exception as e:
+            print(f"Error extracting text: {e}")
+            texts.append(None)
+    
+    return texts
+
 def contains_nutrition_keywords(text):
     """Check if the text contains nutrition-related keywords."""
-    keywords = [
-        "nutrition", "serving", "calories", "fat", "protein", 
-        "carbohydrate", "sodium", "sugar", "vitamin", "mineral"
-    ]
-    for keyword in keywords:
-        if re.search(rf'\b{keyword}\b', text, re.IGNORECASE):
-            return True
-    return False
+    return _KEYWORDS_RE.search(text.lower()) is not None
 
-def parse_nutrition_info(text):
+def _lower_aligned(text):
+    """Lowercase text, keeping every character at the same offset."""
+    text_lower = text.lower()
+    if len(text_lower) != len(text):
+        # A few characters (e.g. 'İ') lowercase to two, keep those unchanged
+        text_lower = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+    return text_lower
+
+def _original_group(text, match, group=1):
+    """Return a group matched in the lowercased text, sliced from the original."""
+    return text[match.start(group):match.end(group)]
+
+def parse_nutrition_info(text, text_lower=None):
     """Parse nutrition information from extracted text with more robust patterns."""
-    if not contains_nutrition_keywords(text):
+    # Patterns run on the lowercased text; captured values are sliced
+    # from the original so they keep their case
+    if text_lower is None:
+        text_lower = _lower_aligned(text)
+    
+    if _KEYWORDS_RE.search(text_lower) is None:
         print("Warning: Extracted text doesn't appear to contain nutrition information.")
     
     nutrition_data = {
@@ -228,90 +504,43 @@ def parse_nutrition_info(text):
     # Enhanced pattern matching with fallbacks
     
     # Extract serving size - try multiple patterns
-    serving_patterns = [
-        r"Serving\s+Size[:\s]*([^\.]*?)(Serving|Amount|Calories|Per)",
-        r"Serving\s+Size[:\s]*([0-9]+\s*[a-zA-Z]*)",
-        r"Serving[:\s]*([0-9]+\s*[a-zA-Z]*)",
-    ]
-    
-    for pattern in serving_patterns:
-        serving_match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _SERVING_PATTERNS:
+        serving_match = pattern.search(text_lower)
         if serving_match:
-            serving_size = serving_match.group(1).strip()
+            serving_size = _original_group(text, serving_match).strip()
             if serving_size:
                 nutrition_data["serving_size"] = serving_size
                 break
     
     # Extract calories - try multiple patterns
-    calories_patterns = [
-        r"Calories\s+(\d+)",
-        r"Energy\s+(\d+)\s*kcal",
-        r"Cal[:\s]*(\d+)",
-    ]
-    
-    for pattern in calories_patterns:
-        calories_match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _CALORIES_PATTERNS:
+        calories_match = pattern.search(text_lower)
         if calories_match:
-            nutrition_data["calories"] = calories_match.group(1).strip()
+            nutrition_data["calories"] = _original_group(text, calories_match).strip()
             break
     
-    # Extract other nutrition facts with more flexible patterns
-    
-    # Total Fat
-    fat_match = re.search(r"Total\s+Fat\s*[:\s]*\s*(\d+\.?\d*\s*[g%])", text, re.IGNORECASE)
-    if fat_match:
-        nutrition_data["total_fat"] = fat_match.group(1).strip()
-    
-    # Saturated Fat
-    sat_fat_match = re.search(r"Saturated\s+Fat\s*[:\s]*\s*(\d+\.?\d*\s*[g%])", text, re.IGNORECASE)
-    if sat_fat_match:
-        nutrition_data["saturated_fat"] = sat_fat_match.group(1).strip()
-    
-    # Cholesterol
-    chol_match = re.search(r"Cholesterol\s*[:\s]*\s*(\d+\s*mg)", text, re.IGNORECASE)
-    if chol_match:
-        nutrition_data["cholesterol"] = chol_match.group(1).strip()
-    
-    # Sodium
-    sodium_match = re.search(r"Sodium\s*[:\s]*\s*(\d+\s*mg)", text, re.IGNORECASE)
-    if sodium_match:
-        nutrition_data["sodium"] = sodium_match.group(1).strip()
-    
-    # Total Carbohydrate
-    carb_match = re.search(r"(Total\s+)?Carbohydrate\s*[:\s]*\s*(\d+\.?\d*\s*[g%])", text, re.IGNORECASE)
-    if carb_match:
-        nutrition_data["total_carbohydrate"] = carb_match.group(2).strip()
-    
-    # Dietary Fiber
-    fiber_match = re.search(r"(Dietary\s+)?Fiber\s*[:\s]*\s*(\d+\.?\d*\s*[g%])", text, re.IGNORECASE)
-    if fiber_match:
-        nutrition_data["dietary_fiber"] = fiber_match.group(2).strip()
-    
-    # Sugars
-    sugar_match = re.search(r"Sugars\s*[:\s]*\s*(\d+\.?\d*\s*[g%])", text, re.IGNORECASE)
-    if sugar_match:
-        nutrition_data["sugars"] = sugar_match.group(1).strip()
-    
-    # Protein
-    protein_match = re.search(r"Protein\s*[:\s]*\s*(\d+\.?\d*\s*[g%])", text, re.IGNORECASE)
-    if protein_match:
-        nutrition_data["protein"] = protein_match.group(1).strip()
+    # Extract other nutrition facts with more flexible patterns, all in
+    # one pass over the text
+    for match in _NUTRIENTS_RE.finditer(text_lower):
+        key = match.lastgroup
+        # Keep the first occurrence of each field
+        if nutrition_data[key] is None:
+            nutrition_data[key] = _original_group(text, match, key).strip()
     
     # Extract ingredients - multiple strategies
     
     # Strategy 1: Look for an "Ingredients:" section
-    ingredients_section = re.split(r'(?:Ingredients|INGREDIENTS)[:\s]', text, flags=re.IGNORECASE)
-    if len(ingredients_section) > 1:
+    ingredients_headers = _INGREDIENTS_SPLIT_RE.finditer(text_lower)
+    first_header = next(ingredients_headers, None)
+    if first_header:
         # Get the text after "Ingredients:" until the next section
-        potential_ingredients = ingredients_section[1].strip()
-        # Limit to the first paragraph or section
-        end_markers = [
-            "\n\n", "Nutrition Facts", "Distributed by", "Keep Refrigerated", 
-            "Allergen", "Contains", "Storage", "Best before", "how2recycle", "PLASTIC"
-        ]
-        for marker in end_markers:
-            if marker.lower() in potential_ingredients.lower():
-                potential_ingredients = potential_ingredients.split(marker, 1)[0].strip()
+        next_header = next(ingredients_headers, None)
+        section_end = next_header.start() if next_header else len(text)
+        potential_ingredients = text[first_header.end():section_end].strip()
+        # Limit to the first paragraph or section (cut at the earliest end marker)
+        end_match = _END_MARKERS_RE.search(potential_ingredients)
+        if end_match:
+            potential_ingredients = potential_ingredients[:end_match.start()].strip()
         
         # Ensure the extracted ingredients are of reasonable length
         if len(potential_ingredients) > 10:  # Reasonable minimum length for ingredients
@@ -319,108 +548,72 @@ def parse_nutrition_info(text):
 
     # Strategy 2: Look for comma-separated lists that might be ingredients
     if not nutrition_data["ingredients"]:
-        lines = text.split('\n')
-        for line in lines:
-            # If the line has multiple commas and looks like ingredients
-            if line.count(',') >= 2 and len(line) > 30:
-                # Check if it has common ingredient words
-                ingredient_indicators = [
-                    "water", "sugar", "salt", "oil", "extract", "acid", 
-                    "flour", "starch", "natural", "artificial"
-                ]
-                if any(indicator in line.lower() for indicator in ingredient_indicators):
-                    nutrition_data["ingredients"] = line.strip()
-                    break
+        lines = zip(text.split('\n'), text_lower.split('\n'))
+        for line, line_lower in lines:
+            # If the line has multiple commas and contains common ingredient words
+            if line.count(',') >= 2 and len(line) > 30 and _INGREDIENT_INDICATORS_RE.search(line_lower):
+                nutrition_data["ingredients"] = line.strip()
+                break
     
     # Strategy 3: Look for "Contains:" statements which often list allergens
-    contains_match = re.search(r"Contains[:\s]\s*([^\.]*)", text, re.IGNORECASE)
+    contains_match = _CONTAINS_RE.search(text_lower)
     if contains_match and not nutrition_data["ingredients"]:
-        nutrition_data["ingredients"] = "Contains: " + contains_match.group(1).strip()
+        nutrition_data["ingredients"] = "Contains: " + _original_group(text, contains_match).strip()
     
     return nutrition_data
 
+def _is_word_char(char):
+    """Return True if char counts as a word character for regex \\b."""
+    return char.isalnum() or char == "_"
+
 def check_for_allergens(ingredients_text):
     """Check for common allergens in ingredients with improved detection."""
     if not ingredients_text:
         return []
     
-    common_allergens = [
-        "milk", "dairy", "lactose", "whey", "casein",
-        "egg", "eggs",
-        "peanut", "peanuts",
-        "tree nut", "tree nuts", "almond", "almonds", "walnut", "walnuts", "cashew", "cashews", 
-        "pistachio", "pistachios", "hazelnut", "hazelnuts", "pecan", "pecans",
-        "soy", "soya", "tofu", "edamame",
-        "wheat", "gluten", "barley", "rye", "spelt", "triticale",
-        "fish", "shellfish", "crustacean", "crustaceans", "shrimp", "crab", "lobster",
-        "sulfite", "sulfites",
-        "sesame", "mustard"
-    ]
-    
-    found_allergens = []
     ingredients_lower = ingredients_text.lower()
     
-    for allergen in common_allergens:
-        if re.search(r'\b' + re.escape(allergen) + r'\b', ingredients_lower):
-            found_allergens.append(allergen)
+    # Single linear scan when pyahocorasick is available
+    if _ALLERGEN_AUTOMATON is not None:
+        found_groups = set()
+        for end, (group, allergen) in _ALLERGEN_AUTOMATON.iter(ingredients_lower):
+            start = end - len(allergen) + 1
+            # Enforce the same word boundaries as the r'\b...\b' pattern
+            if start > 0 and _is_word_char(ingredients_lower[start - 1]):
+                continue
+            if end + 1 < len(ingredients_lower) and _is_word_char(ingredients_lower[end + 1]):
+                continue
+            found_groups.add(group)
+        return list(found_groups)
     
-    # Special case for "may contain" statements
-    may_contain_match = re.search(r"may\s+contain\s+([^\.]*)", ingredients_lower)
-    if may_contain_match:
-        may_contain_text = may_contain_match.group(1)
-        for allergen in common_allergens:
-            if re.search(r'\b' + re.escape(allergen) + r'\b', may_contain_text):
-                found_allergens.append(allergen)
+    # Otherwise one scan with the compiled alternation. "May contain"
+    # statements are part of the same text, so they need no separate pass.
+    found_allergens = [match.group(1) for match in _ALLERGENS_RE.finditer(ingredients_lower)]
     
     # Deduplicate related allergens
-    allergen_groups = {
-        "milk": ["milk", "dairy", "lactose", "whey", "casein"],
-        "eggs": ["egg", "eggs"],
-        "peanuts": ["peanut", "peanuts"],
-        "tree nuts": ["tree nut", "tree nuts", "almond", "almonds", "walnut", "walnuts", "cashew", "cashews", "pistachio", "pistachios", "hazelnut", "hazelnuts", "pecan", "pecans"],
-        "soy": ["soy", "soya", "tofu", "edamame"],
-        "wheat/gluten": ["wheat", "gluten", "barley", "rye", "spelt", "triticale"],
-        "fish": ["fish"],
-        "shellfish": ["shellfish", "crustacean", "crustaceans", "shrimp", "crab", "lobster"],
-        "sulfites": ["sulfite", "sulfites"],
-        "sesame": ["sesame"],
-        "mustard": ["mustard"]
-    }
-    
-    deduplicated_allergens = set()
-    for found in found_allergens:
-        for group, items in allergen_groups.items():
-            if found in items:
-                deduplicated_allergens.add(group)
-                break
-    
-    return list(deduplicated_allergens)
+    return list({_ALLERGEN_TO_GROUP[found] for found in found_allergens})
+
+def _extract_numeric(value_str):
+    """Return the first number in a nutrient value string, or None."""
+    match = _NUMERIC_RE.search(value_str) if value_str else None
+    return float(match.group(1)) if match else None
 
 def check_nutritional_concerns(nutrition_data):
     """Check for nutritional concerns based on the nutrition data."""
     concerns = []
     
-    # Extract numeric values with more robust patterns
-    def extract_numeric(value_str):
-        if not value_str:
-            return None
-        match = re.search(r'(\d+\.?\d*)', value_str)
-        if match:
-            return float(match.group(1))
-        return None
-    
     # High sodium check
-    sodium_value = extract_numeric(nutrition_data.get("sodium"))
+    sodium_value = _extract_numeric(nutrition_data.get("sodium"))
     if sodium_value is not None and sodium_value > 500:
         concerns.append("high sodium")
     
     # High sugar check
-    sugar_value = extract_numeric(nutrition_data.get("sugars"))
+    sugar_value = _extract_numeric(nutrition_data.get("sugars"))
     if sugar_value is not None and sugar_value > 20:
         concerns.append("high sugar")
     
     # High fat check
-    fat_value = extract_numeric(nutrition_data.get("total_fat"))
+    fat_value = _extract_numeric(nutrition_data.get("total_fat"))
     if fat_value is not None and fat_value > 15:
         concerns.append("high fat")
     